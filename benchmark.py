@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+登录流程压测脚本 - 对本地模拟上游（fake_upstream.py）执行批量登录，
+报告不同账号数和并发数下的吞吐量（账号/分钟）、各阶段耗时和内存占用
+
+用法:
+    python benchmark.py --accounts 1,10,50 --workers 1,4,8
+    python benchmark.py --upstream http://127.0.0.1:5100 --accounts 20 --workers 4
+    python benchmark.py --reuse-session   # 测量复用已保存会话时的开销
+    python benchmark.py --import-only     # 只测量 import app 的耗时和内存
+
+使用临时目录中的独立数据库，不会修改 instance/auto_login.db。
+"""
+
+import argparse
+import json
+import logging
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import fake_upstream
+
+
+def current_rss_mb():
+    """当前进程常驻内存（MB）"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError):
+        return None
+
+
+def peak_rss_mb():
+    """进程启动以来的峰值常驻内存（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+# 在全新解释器中导入 app，输出耗时、内存和已加载的重量级模块
+IMPORT_PROBE = """
+import json, os, sys, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+with open('/proc/self/statm') as f:
+    rss = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+heavy = [m for m in ('ddddocr', 'onnxruntime', 'numpy', 'PIL', 'cryptography', 'smtplib') if m in sys.modules]
+print(json.dumps({'seconds': elapsed, 'rss_mb': rss, 'heavy_modules': heavy}))
+"""
+
+
+def measure_import(repeat):
+    """多次在子进程中导入 app，返回耗时和内存的中位数"""
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', IMPORT_PROBE], cwd=project_dir,
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        'seconds': round(statistics.median(sample['seconds'] for sample in samples), 3),
+        'rss_mb': round(statistics.median(sample['rss_mb'] for sample in samples), 1),
+        'heavy_modules': samples[-1]['heavy_modules']
+    }
+
+
+def parse_list(value):
+    return [int(item) for item in value.split(',') if item.strip()]
+
+
+def reset_accounts(app_module, count, keep_sessions):
+    """用 count 个压测账号替换数据库中的账号"""
+    with app_module.app.app_context():
+        db = app_module.db
+        if not keep_sessions:
+            app_module.AccountSession.query.delete()
+        app_module.Account.query.delete()
+        for i in range(count):
+            db.session.add(app_module.Account(
+                id=i + 1, account=f"bench{i}@example.com", password='bench-password', name=f"bench{i}"))
+        db.session.commit()
+        db.session.remove()
+
+
+def phase_latencies(app_module, run_id):
+    """从 LoginAttempt 统计本次运行各阶段的 p50/p95（毫秒）"""
+    app_module.log_sink.flush()
+    with app_module.app.app_context():
+        LoginAttempt = app_module.LoginAttempt
+        rows = LoginAttempt.query.filter_by(run_id=run_id).all()
+        result = {}
+        for phase in ('duration',) + tuple(f'{p}_seconds' for p in app_module.LOGIN_PHASES):
+            values = sorted(getattr(row, phase) * 1000 for row in rows if getattr(row, phase) is not None)
+            if values:
+                result[phase.replace('_seconds', '')] = {
+                    'p50': round(app_module.percentile(values, 0.5), 1),
+                    'p95': round(app_module.percentile(values, 0.95), 1)
+                }
+        app_module.db.session.remove()
+        return len(rows), result
+
+
+def run_case(app_module, accounts, workers, reuse_session):
+    reset_accounts(app_module, accounts, keep_sessions=False)
+    if reuse_session:
+        # 先执行一轮完整登录保存会话，再测量复用会话的一轮
+        app_module.scheduled_login(max_workers=workers, source='压测预热')
+    rss_before = current_rss_mb()
+    started = time.time()
+    summary = app_module.scheduled_login(max_workers=workers, source='压测')
+    elapsed = time.time() - started
+    attempts, phases = phase_latencies(app_module, summary['run_id'])
+    return {
+        'accounts': accounts,
+        'workers': summary['workers'],
+        'success': summary['success'],
+        'failed': summary['failed'],
+        'error': summary['error'],
+        'attempts': attempts,
+        'seconds': round(elapsed, 2),
+        'accounts_per_minute': round(summary['success'] / elapsed * 60, 1) if elapsed else None,
+        'rss_mb': round(current_rss_mb() or 0, 1),
+        'rss_delta_mb': round((current_rss_mb() or 0) - (rss_before or 0), 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'phases_ms': phases
+    }
+
+
+def print_case(result):
+    print(f"\n账号 {result['accounts']:>4} | 并发 {result['workers']:>3} | "
+          f"成功 {result['success']} 失败 {result['failed']} 异常 {result['error']} | "
+          f"尝试 {result['attempts']} | 耗时 {result['seconds']} 秒 | "
+          f"{result['accounts_per_minute']} 账号/分钟 | "
+          f"内存 {result['rss_mb']} MB (+{result['rss_delta_mb']}, 峰值 {result['peak_rss_mb']})")
+    for phase, latency in result['phases_ms'].items():
+        print(f"    {phase:<14} p50 {latency['p50']:>8} ms   p95 {latency['p95']:>8} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='登录流程压测')
+    parser.add_argument('--accounts', type=parse_list, default=[1, 10, 50], help='账号数，逗号分隔')
+    parser.add_argument('--workers', type=parse_list, default=[1, 4, 8], help='并发数，逗号分隔')
+    parser.add_argument('--upstream', help='已运行的上游地址；不指定时在本进程内启动模拟服务')
+    parser.add_argument('--reuse-session', action='store_true', help='测量复用已保存会话的登录')
+    parser.add_argument('--json', help='把结果写入 JSON 文件')
+    parser.add_argument('--import-only', action='store_true', help='只测量导入 app 的耗时和内存')
+    parser.add_argument('--import-repeat', type=int, default=5, help='导入测量次数')
+    fake_upstream.add_arguments(parser)
+    args = parser.parse_args()
+
+    result = measure_import(args.import_repeat)
+    print(f"导入 app: {result['seconds']} 秒, 内存 {result['rss_mb']} MB, "
+          f"已加载的重量级模块: {', '.join(result['heavy_modules']) or '无'}")
+    if args.import_only:
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({'import': result}, f, ensure_ascii=False, indent=2)
+        return
+
+    server = None
+    if args.upstream:
+        base_url = args.upstream.rstrip('/')
+    else:
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        server, base_url = fake_upstream.serve_in_thread(fake_upstream.from_arguments(args))
+    print(f"上游地址: {base_url}")
+
+    if args.json:
+        args.json = os.path.abspath(args.json)
+    workdir = tempfile.mkdtemp(prefix='login-bench-')
+    os.environ['UPSTREAM_BASE_URL'] = base_url
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['LOGIN_ACCOUNT_INTERVAL'] = '0'
+    os.environ['SESSION_REUSE'] = '1' if args.reuse_session else '0'
+    os.environ.setdefault('LOG_RETENTION_DAYS', '0')
+    # 日志文件写入临时目录
+    os.chdir(workdir)
+
+    import_started = time.time()
+    import app as app_module
+    print(f"导入 app 耗时 {time.time() - import_started:.2f} 秒, 内存 {current_rss_mb():.1f} MB, 工作目录 {workdir}")
+
+    app_module.init_database()
+    with app_module.app.app_context():
+        app_module.EmailConfig.query.update({'is_active': False})
+        app_module.db.session.commit()
+        app_module.db.session.remove()
+    app_module.ocr_pool.warm_up()
+    if app_module.ocr_executor.enabled:
+        app_module.ocr_executor.warm_up()
+
+    results, seen = [], set()
+    for accounts in args.accounts:
+        for workers in args.workers:
+            # 并发数不超过账号数，超过时与 workers=accounts 相同
+            if (accounts, min(workers, accounts)) in seen:
+                continue
+            seen.add((accounts, min(workers, accounts)))
+            result = run_case(app_module, accounts, workers, args.reuse_session)
+            print_case(result)
+            results.append(result)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.json}")
+
+    app_module.log_sink.stop()
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
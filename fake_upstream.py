@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+模拟上游接口 - 本地实现 generateCaptchaToken / captcha / login / club/getClubList，
+用于在不访问真实服务器的情况下测试和压测登录流程
+
+用法:
+    python fake_upstream.py --port 5100 --latency 50 --error-rate 0.02
+    UPSTREAM_BASE_URL=http://127.0.0.1:5100 python app.py
+"""
+
+import argparse
+import base64
+import io
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from flask import Flask, jsonify, request
+from PIL import Image, ImageDraw, ImageFont
+
+CAPTCHA_CHARS = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+
+
+class FakeUpstream:
+    """模拟服务的状态：每个 token 对应一对新生成的 RSA 密钥和一张验证码"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, key_bits=1024,
+                 token_ttl=60, session_ttl=3600, check_captcha=True, max_tokens=10000):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.key_bits = key_bits
+        self.token_ttl = token_ttl
+        self.session_ttl = session_ttl
+        self.check_captcha = check_captcha
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self._tokens = OrderedDict()  # token -> [private_key, captcha, created_at]
+        self._sessions = {}  # token -> 登录成功时间
+        self.stats = {'token': 0, 'captcha': 0, 'login': 0, 'login_ok': 0, 'club': 0, 'errors': 0}
+
+    def delay(self):
+        """模拟网络和服务端耗时，按 error_rate 概率返回服务端错误"""
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+        if self.error_rate and random.random() < self.error_rate:
+            with self._lock:
+                self.stats['errors'] += 1
+            return True
+        return False
+
+    def new_token(self):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=self.key_bits)
+        der = private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.DER,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        token = base64.b64encode(der).decode()
+        with self._lock:
+            self._tokens[token] = [private_key, None, time.time()]
+            while len(self._tokens) > self.max_tokens:
+                self._tokens.popitem(last=False)
+            self.stats['token'] += 1
+        return token
+
+    def entry(self, token):
+        with self._lock:
+            entry = self._tokens.get(token)
+        if entry is None or time.time() - entry[2] > self.token_ttl:
+            return None
+        return entry
+
+    def new_captcha(self, token):
+        entry = self.entry(token)
+        if entry is None:
+            return None
+        text = ''.join(random.choice(CAPTCHA_CHARS) for _ in range(4))
+        entry[1] = text
+        with self._lock:
+            self.stats['captcha'] += 1
+        return base64.b64encode(render_captcha(text)).decode()
+
+    def login(self, token, account, data, safe_code):
+        """返回 (iErrCode, sErrMsg)"""
+        with self._lock:
+            self.stats['login'] += 1
+        entry = self.entry(token)
+        if entry is None:
+            return 1, "token已失效"
+        private_key, captcha, _ = entry
+        # 验证码只能使用一次
+        entry[1] = None
+        if self.check_captcha and (not captcha or (safe_code or '').upper() != captcha):
+            return 1, "验证码错误"
+        try:
+            decrypt_long(private_key, account)
+            decrypt_long(private_key, data)
+        except Exception:
+            return 1, "账号或密码错误"
+        with self._lock:
+            self._sessions[token] = time.time()
+            self.stats['login_ok'] += 1
+        return 0, ""
+
+    def session_valid(self, token):
+        with self._lock:
+            self.stats['club'] += 1
+            logged_in_at = self._sessions.get(token)
+        return logged_in_at is not None and time.time() - logged_in_at <= self.session_ttl
+
+
+def render_captcha(text):
+    """生成带干扰线的验证码 PNG"""
+    image = Image.new('RGB', (100, 40), (random.randint(200, 255),) * 3)
+    draw = ImageDraw.Draw(image)
+    for _ in range(4):
+        draw.line([(random.randint(0, 100), random.randint(0, 40)),
+                   (random.randint(0, 100), random.randint(0, 40))],
+                  fill=(random.randint(100, 200),) * 3)
+    font = ImageFont.load_default(size=26)
+    for i, char in enumerate(text):
+        draw.text((8 + i * 22, random.randint(2, 8)), char, font=font,
+                  fill=(random.randint(0, 120), random.randint(0, 120), random.randint(0, 120)))
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def decrypt_long(private_key, encrypted_base64):
+    """按密钥长度分块解密 app.rsa_encrypt_long 的结果"""
+    encrypted = base64.b64decode(encrypted_base64)
+    block_size = private_key.key_size // 8
+    return b''.join(
+        private_key.decrypt(encrypted[i:i + block_size], padding.PKCS1v15())
+        for i in range(0, len(encrypted), block_size)
+    )
+
+
+def create_app(upstream):
+    fake = Flask(__name__)
+
+    def error_response():
+        return jsonify({'iErrCode': 500, 'sErrMsg': '服务器繁忙'}), 500
+
+    @fake.route('/', methods=['GET', 'HEAD'])
+    def index():
+        return ''
+
+    @fake.route('/cms-api/token/generateCaptchaToken', methods=['POST'])
+    def generate_captcha_token():
+        if upstream.delay():
+            return error_response()
+        return jsonify({'iErrCode': 0, 'result': upstream.new_token()})
+
+    @fake.route('/cms-api/captcha', methods=['POST'])
+    def captcha():
+        if upstream.delay():
+            return error_response()
+        image = upstream.new_captcha(request.form.get('token', ''))
+        if image is None:
+            return jsonify({'iErrCode': 1, 'sErrMsg': 'token已失效'})
+        return jsonify({'iErrCode': 0, 'result': image})
+
+    @fake.route('/cms-api/login', methods=['POST'])
+    def login():
+        if upstream.delay():
+            return error_response()
+        code, message = upstream.login(
+            request.form.get('token', ''),
+            request.form.get('account', ''),
+            request.form.get('data', ''),
+            request.form.get('safeCode', '')
+        )
+        return jsonify({'iErrCode': code, 'sErrMsg': message, 'result': None})
+
+    @fake.route('/cms-api/club/getClubList', methods=['POST'])
+    def club_list():
+        if upstream.delay():
+            return error_response()
+        if not upstream.session_valid(request.headers.get('token', '')):
+            return jsonify({'iErrCode': 2, 'sErrMsg': '登录已过期'})
+        return jsonify({'iErrCode': 0, 'result': [{
+            'lClubID': 1000,
+            'sClubName': '模拟俱乐部',
+            'lCreateUser': 1,
+            'iCreditLeagueId': 0
+        }]})
+
+    @fake.route('/stats', methods=['GET'])
+    def stats():
+        return jsonify(upstream.stats)
+
+    return fake
+
+
+def add_arguments(parser):
+    parser.add_argument('--latency', type=float, default=50, help='每个请求的平均延迟（毫秒）')
+    parser.add_argument('--jitter', type=float, default=10, help='延迟随机抖动范围（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回 HTTP 500 的概率')
+    parser.add_argument('--key-bits', type=int, default=1024, help='每个 token 的 RSA 密钥长度')
+    parser.add_argument('--token-ttl', type=int, default=60, help='token 有效期（秒）')
+    parser.add_argument('--session-ttl', type=int, default=3600, help='登录后会话有效期（秒）')
+    parser.add_argument('--no-captcha-check', action='store_true', help='登录时不校验验证码')
+
+
+def from_arguments(args):
+    return FakeUpstream(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+        key_bits=args.key_bits,
+        token_ttl=args.token_ttl,
+        session_ttl=args.session_ttl,
+        check_captcha=not args.no_captcha_check
+    )
+
+
+def serve_in_thread(upstream, host='127.0.0.1', port=0):
+    """在后台线程中启动模拟服务，返回 (server, base_url)"""
+    from werkzeug.serving import make_server
+
+    server = make_server(host, port, create_app(upstream), threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name='fake-upstream', daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='模拟上游登录接口')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5100)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    print(f"模拟上游接口: http://{args.host}:{args.port}  (UPSTREAM_BASE_URL)")
+    create_app(from_arguments(args)).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+gunicorn 配置 - 用法: gunicorn app:app -c gunicorn.conf.py
+
+主进程启动时在独立的子进程中初始化一次数据库（建表、升级、默认数据），
+避免多个 worker 同时初始化空数据库时互相冲突；主进程本身不导入 app，各 worker 仍各自加载应用。
+每个 worker 启动后只启动租约、调度器和后台任务（init_app 不阻塞，首次登录在后台执行）；
+多个 worker 同时运行调度器，由数据库租约保证只有一个 worker 执行定时任务。
+
+每个实时日志连接（/api/logs/stream）在 gthread worker 中占用一个线程，最长 LOG_STREAM_MAX_SECONDS 秒；
+LOG_STREAM_MAX_CLIENTS 限制每个 worker 同时保持的连接数（超出的页面改为定时刷新），
+线程数需大于该上限，剩余线程处理其它接口。
+"""
+
+import os
+import subprocess
+import sys
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 10000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+
+def on_starting(server):
+    # worker 尚未启动，本机之前的进程遗留的登录任务和账号占用都可以清理
+    subprocess.run(
+        [sys.executable, '-c',
+         'import app; app.init_database(); app.cleanup_orphaned_logins(all_local=True)'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+
+
+def post_worker_init(worker):
+    from app import init_app
+    init_app(init_db=False)
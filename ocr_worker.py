@@ -0,0 +1,112 @@
+"""
+验证码识别工作进程 - 供 app.py 的多进程识别服务使用
+
+子进程只导入本模块，不加载 Flask 应用。
+"""
+
+_ocr = None
+_charset = None
+_group_cache = {}
+
+
+def limit_onnx_threads(threads):
+    """限制之后创建的 onnxruntime 会话使用的线程数（ddddocr 创建会话时不传 SessionOptions）"""
+    import onnxruntime
+
+    if threads <= 0 or getattr(onnxruntime.InferenceSession, '_thread_limited', False):
+        return
+
+    original = onnxruntime.InferenceSession
+
+    class ThreadLimitedSession(original):
+        _thread_limited = True
+
+        def __init__(self, path_or_bytes, sess_options=None, *args, **kwargs):
+            if sess_options is None:
+                sess_options = onnxruntime.SessionOptions()
+                sess_options.intra_op_num_threads = threads
+                sess_options.inter_op_num_threads = 1
+            super().__init__(path_or_bytes, sess_options, *args, **kwargs)
+
+    onnxruntime.InferenceSession = ThreadLimitedSession
+
+
+def _char_groups(chars, charset):
+    """把模型字符表中允许输出的字符按大写形式分组（验证码不区分大小写，'a' 和 'A' 是同一个字符），
+    返回 (按组排列的下标, 每组起始位置, 每组输出的字符)；第 0 组是下标 0 的 CTC 空白符"""
+    key = (len(chars), charset)
+    if key not in _group_cache:
+        groups = {}
+        for i, c in enumerate(chars):
+            if i == 0:
+                continue
+            upper = c.upper()
+            if not charset or upper in charset:
+                groups.setdefault(upper, []).append(i)
+        columns, starts, labels = [0], [0], ['']
+        for upper, indices in groups.items():
+            starts.append(len(columns))
+            columns.extend(indices)
+            labels.append(upper)
+        _group_cache[key] = (columns, starts, labels)
+    return _group_cache[key]
+
+
+def recognize(ocr, image, charset):
+    """识别验证码，只在 charset 范围内解码，返回 (大写文本, 置信度)
+
+    同一字符的大小写概率相加后再解码；置信度取各输出字符（在允许字符内重新归一化后）概率的最小值；
+    ddddocr 不支持概率输出时置信度记为 1.0。
+    """
+    try:
+        result = ocr.classification(image, probability=True)
+    except TypeError:
+        return ocr.classification(image).upper(), 1.0
+
+    import numpy as np
+
+    # 新版返回 charset/probabilities，旧版返回 charsets/probability
+    if 'probabilities' in result:
+        chars, probs = result['charset'], result['probabilities']
+    else:
+        chars, probs = result['charsets'], result['probability']
+    probs = np.asarray(probs, dtype=np.float32)
+    probs = probs.reshape(-1, probs.shape[-1])
+
+    columns, starts, labels = _char_groups(chars, (charset or '').upper())
+    sub = np.add.reduceat(probs[:, columns], starts, axis=1)
+    sub = sub / np.maximum(sub.sum(axis=1, keepdims=True), 1e-12)
+    best = sub.argmax(axis=1)
+    best_prob = sub.max(axis=1)
+
+    text, confidences, prev = [], [], None
+    for group, p in zip(best, best_prob):
+        if group != 0:
+            if group != prev:
+                text.append(labels[group])
+                confidences.append(float(p))
+            else:
+                confidences[-1] = max(confidences[-1], float(p))
+        prev = group
+    return ''.join(text), (min(confidences) if confidences else 0.0)
+
+
+def init_worker(threads, charset=''):
+    """进程池初始化：限制线程数并预先加载模型"""
+    global _ocr, _charset
+    import ddddocr
+
+    limit_onnx_threads(threads)
+    _ocr = ddddocr.DdddOcr(show_ad=False)
+    _charset = charset
+
+
+def classify_batch(images):
+    """识别一批验证码图片，返回 [(是否成功, (文本, 置信度) 或错误信息), ...]"""
+    results = []
+    for image in images:
+        try:
+            results.append((True, recognize(_ocr, image, _charset)))
+        except Exception as e:
+            results.append((False, str(e)))
+    return results
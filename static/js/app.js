@@ -1,8 +1,14 @@
 // 全局变量
 let currentPage = 1;
-let refreshInterval = null;
+let pageCursors = [null]; // 每页起始游标，第一页为 null
 let keepAliveInterval = null;
-let currentRefreshInterval = 10000; // 默认10秒
+let liveLogs = true; // 实时推送日志（SSE），false 表示手动刷新
+let logStream = null;
+let logStreamRetryTimer = null;
+let lastLogId = 0;
+let logTotal = 0;
+const MAX_LIVE_LOGS = 200;
+let loginJobTimer = null;
 
 // 初始化
 document.addEventListener('DOMContentLoaded', function() {
@@ -86,44 +92,41 @@ async function loadLogs() {
         const accountFilter = document.getElementById('accountFilter').value;
         const levelFilter = document.getElementById('levelFilter').value;
         
-        const url = `/api/logs?page=${currentPage}&per_page=50&date=${dateFilter}&account=${accountFilter}&level=${levelFilter}`;
+        let url = `/api/logs?per_page=50&count=cached&date=${dateFilter}&account=${accountFilter}&level=${levelFilter}`;
+        const cursor = pageCursors[currentPage - 1];
+        if (cursor) {
+            url += `&before_id=${cursor.before_id}&before_ts=${encodeURIComponent(cursor.before_ts)}`;
+        }
         const response = await fetch(url);
         const data = await response.json();
+        pageCursors[currentPage] = data.next_cursor;
         
         // 更新日志计数
+        logTotal = data.total;
         document.getElementById('logCount').textContent = `共 ${data.total} 条日志`;
         
         // 更新分页按钮
         document.getElementById('prevBtn').disabled = currentPage <= 1;
-        document.getElementById('nextBtn').disabled = currentPage >= data.pages;
+        document.getElementById('nextBtn').disabled = !data.has_more;
         
         // 显示日志
         const container = document.getElementById('logsContainer');
         container.innerHTML = '';
+        // 第一页重新加载（包括过滤条件变化、清空日志后）时从本页最新的日志开始续传
+        if (currentPage === 1) {
+            lastLogId = data.logs.reduce((maxId, log) => Math.max(maxId, log.id), 0);
+        }
         
         if (data.logs.length === 0) {
-            container.innerHTML = '<div class="text-center text-muted py-5">暂无日志数据</div>';
-            return;
+            container.innerHTML = '<div class="text-center text-muted py-5" id="logsEmpty">暂无日志数据</div>';
+        } else {
+            data.logs.forEach(log => container.appendChild(renderLogEntry(log)));
+            // 滚动到顶部
+            container.scrollTop = 0;
         }
         
-        data.logs.forEach(log => {
-            const logEntry = document.createElement('div');
-            logEntry.className = `log-entry ${log.level}`;
-            logEntry.innerHTML = `
-                <div class="d-flex justify-content-between align-items-start">
-                    <div>
-                        <strong>${log.account_name}</strong>
-                        <span class="badge bg-secondary ms-2">${log.level}</span>
-                        <small class="text-muted ms-2">${new Date(log.timestamp).toLocaleString()}</small>
-                    </div>
-                </div>
-                <div class="mt-2">${log.message}</div>
-            `;
-            container.appendChild(logEntry);
-        });
-        
-        // 滚动到顶部
-        container.scrollTop = 0;
+        // 第一页时通过实时日志流追加新日志
+        startLogStream();
         
         // 加载过滤选项
         if (document.getElementById('dateFilter').options.length === 1) {
@@ -135,27 +138,104 @@ async function loadLogs() {
     }
 }
 
+// 生成单条日志元素
+function renderLogEntry(log) {
+    const logEntry = document.createElement('div');
+    logEntry.className = `log-entry ${log.level}`;
+    logEntry.innerHTML = `
+        <div class="d-flex justify-content-between align-items-start">
+            <div>
+                <strong>${log.account_name}</strong>
+                <span class="badge bg-secondary ms-2">${log.level}</span>
+                <small class="text-muted ms-2">${new Date(log.timestamp).toLocaleString()}</small>
+            </div>
+        </div>
+        <div class="mt-2">${log.message}</div>
+    `;
+    return logEntry;
+}
+
+// 订阅实时日志流，只接收新写入的日志并插入到列表顶部
+function startLogStream() {
+    stopLogStream();
+    if (!liveLogs || currentPage !== 1) {
+        return;
+    }
+    
+    const dateFilter = document.getElementById('dateFilter').value;
+    const accountFilter = document.getElementById('accountFilter').value;
+    const levelFilter = document.getElementById('levelFilter').value;
+    let url = `/api/logs/stream?date=${dateFilter}&account=${accountFilter}&level=${levelFilter}`;
+    if (lastLogId > 0) {
+        url += `&last_id=${lastLogId}`;
+    }
+    
+    logStream = new EventSource(url);
+    logStream.onmessage = function(event) {
+        const log = JSON.parse(event.data);
+        if (log.id <= lastLogId) {
+            return;
+        }
+        lastLogId = log.id;
+        
+        const container = document.getElementById('logsContainer');
+        const empty = document.getElementById('logsEmpty');
+        if (empty) {
+            empty.remove();
+        }
+        container.insertBefore(renderLogEntry(log), container.firstChild);
+        while (container.children.length > MAX_LIVE_LOGS) {
+            container.removeChild(container.lastChild);
+        }
+        
+        logTotal++;
+        document.getElementById('logCount').textContent = `共 ${logTotal} 条日志`;
+    };
+    logStream.onerror = function() {
+        // 服务端拒绝连接（如连接数已满）时浏览器不会自动重连，10 秒后重新加载并再次订阅
+        if (logStream && logStream.readyState === EventSource.CLOSED) {
+            stopLogStream();
+            logStreamRetryTimer = setTimeout(() => {
+                if (liveLogs && currentPage === 1) {
+                    loadLogs();
+                }
+            }, 10000);
+        }
+    };
+    showRefreshIndicator();
+}
+
+// 关闭实时日志流
+function stopLogStream() {
+    if (logStreamRetryTimer) {
+        clearTimeout(logStreamRetryTimer);
+        logStreamRetryTimer = null;
+    }
+    if (logStream) {
+        logStream.close();
+        logStream = null;
+    }
+    hideRefreshIndicator();
+}
+
 // 加载过滤选项
 async function loadFilterOptions() {
     try {
-        // 获取所有日志来提取过滤选项
-        const response = await fetch('/api/logs?per_page=1000');
+        const response = await fetch('/api/logs/facets?counts=0');
         const data = await response.json();
         
-        // 获取唯一日期
-        const dates = [...new Set(data.logs.map(log => log.date))].sort().reverse();
+        // 日期（倒序）
         const dateSelect = document.getElementById('dateFilter');
-        dates.forEach(date => {
+        data.dates.forEach(date => {
             const option = document.createElement('option');
             option.value = date;
             option.textContent = date;
             dateSelect.appendChild(option);
         });
         
-        // 获取唯一账号
-        const accounts = [...new Set(data.logs.map(log => log.account_name))];
+        // 账号
         const accountSelect = document.getElementById('accountFilter');
-        accounts.forEach(account => {
+        data.accounts.forEach(account => {
             const option = document.createElement('option');
             option.value = account;
             option.textContent = account;
@@ -166,9 +246,16 @@ async function loadFilterOptions() {
     }
 }
 
+// 过滤条件变化时回到第一页
+function applyLogFilters() {
+    currentPage = 1;
+    pageCursors = [null];
+    lastLogId = 0;
+    refreshLogs();
+}
+
 // 刷新日志
 function refreshLogs() {
-    showRefreshIndicator();
     loadLogs();
 }
 
@@ -196,7 +283,7 @@ async function clearLogs() {
             
             if (response.ok) {
                 Swal.fire('成功', '日志已清空', 'success');
-                refreshLogs();
+                applyLogFilters();
             } else {
                 Swal.fire('错误', '清空日志失败', 'error');
             }
@@ -207,43 +294,31 @@ async function clearLogs() {
     }
 }
 
-// 改变刷新间隔
+// 切换实时/手动刷新
 function changeRefreshInterval() {
-    const interval = parseInt(document.getElementById('refreshInterval').value);
-    currentRefreshInterval = interval * 1000;
-    
-    if (refreshInterval) {
-        clearInterval(refreshInterval);
-        refreshInterval = null;
+    liveLogs = document.getElementById('refreshInterval').value === 'live';
+    if (liveLogs) {
+        startLogStream();
+    } else {
+        stopLogStream();
     }
-    
-    if (interval > 0) {
-        startAutoRefresh();
-    }
-    
-    hideRefreshIndicator();
 }
 
-// 开始自动刷新
+// 开始自动刷新（切换到实时日志）
 function startAutoRefresh() {
-    if (refreshInterval) {
-        clearInterval(refreshInterval);
-    }
-    
-    if (currentRefreshInterval > 0) {
-        refreshInterval = setInterval(() => {
-            if (document.getElementById('logs-tab').classList.contains('active')) {
-                refreshLogs();
-            }
-        }, currentRefreshInterval);
-        
-        showRefreshIndicator();
+    document.getElementById('refreshInterval').value = 'live';
+    liveLogs = true;
+    if (currentPage !== 1) {
+        currentPage = 1;
+        refreshLogs();
+    } else if (!logStream) {
+        startLogStream();
     }
 }
 
 // 显示刷新指示器
 function showRefreshIndicator() {
-    if (currentRefreshInterval > 0) {
+    if (liveLogs) {
         document.getElementById('refreshIndicator').style.display = 'block';
     }
 }
@@ -262,8 +337,10 @@ function previousPage() {
 }
 
 function nextPage() {
-    currentPage++;
-    refreshLogs();
+    if (pageCursors[currentPage]) {
+        currentPage++;
+        refreshLogs();
+    }
 }
 
 // 显示添加账号模态框
@@ -384,24 +461,71 @@ async function deleteAccount(id) {
     }
 }
 
+// 提交登录任务，返回任务编号
+async function submitLoginJob(payload) {
+    const response = await fetch('/api/jobs/login', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(payload)
+    });
+    const result = await response.json();
+    if (!response.ok) {
+        throw new Error(result.message || '启动登录任务失败');
+    }
+    return result.job;
+}
+
+// 轮询登录任务进度，显示在定时任务卡片中
+function watchLoginJob(job) {
+    const progress = document.getElementById('loginJobProgress');
+    
+    const render = (job) => {
+        const counts = job.counts || {};
+        progress.textContent = `登录任务 ${job.job_id}: 已完成 ${job.completed}/${job.total}` +
+            `（成功 ${counts.success || 0}，失败 ${(counts.failed || 0) + (counts.error || 0)}，` +
+            `进行中 ${counts.running || 0}，跳过 ${counts.skipped || 0}）`;
+    };
+    
+    render(job);
+    clearInterval(loginJobTimer);
+    const timer = loginJobTimer = setInterval(async () => {
+        try {
+            const response = await fetch(`/api/jobs/${job.job_id}`);
+            if (!response.ok) {
+                clearInterval(timer);
+                return;
+            }
+            const current = await response.json();
+            render(current);
+            if (current.status === 'done') {
+                clearInterval(timer);
+                progress.textContent += ' - 已结束';
+                loadAccounts();
+            }
+        } catch (error) {
+            console.error('获取登录任务进度失败:', error);
+        }
+    }, 2000);
+}
+
 // 手动登录
 async function manualLogin(id) {
     try {
-        const response = await fetch(`/api/accounts/${id}/login`, {
-            method: 'POST'
-        });
-        
-        if (response.ok) {
-            Swal.fire('成功', '登录任务已启动，请查看日志', 'success');
-            // 切换到日志标签页
-            document.getElementById('logs-tab').click();
-            startAutoRefresh();
+        const job = await submitLoginJob({ account_ids: [id] });
+        if (job.counts.skipped) {
+            Swal.fire('提示', '该账号正在登录中，请查看日志', 'info');
         } else {
-            Swal.fire('错误', '启动登录任务失败', 'error');
+            Swal.fire('成功', '登录任务已启动，请查看日志', 'success');
         }
+        watchLoginJob(job);
+        // 切换到日志标签页
+        document.getElementById('logs-tab').click();
+        startAutoRefresh();
     } catch (error) {
         console.error('手动登录失败:', error);
-        Swal.fire('错误', '启动登录任务失败', 'error');
+        Swal.fire('错误', error.message || '启动登录任务失败', 'error');
     }
 }
 
@@ -418,28 +542,16 @@ async function runAllAccounts() {
     
     if (result.isConfirmed) {
         try {
-            const response = await fetch('/api/accounts');
-            const accounts = await response.json();
+            const job = await submitLoginJob({ all: true, reuse_session: true });
             
-            let successCount = 0;
-            for (const account of accounts) {
-                if (account.is_active) {
-                    const loginResponse = await fetch(`/api/accounts/${account.id}/login`, {
-                        method: 'POST'
-                    });
-                    if (loginResponse.ok) {
-                        successCount++;
-                    }
-                }
-            }
-            
-            Swal.fire('成功', `已启动 ${successCount} 个账号的登录任务`, 'success');
+            Swal.fire('成功', `已启动 ${job.total} 个启用账号的登录任务`, 'success');
+            watchLoginJob(job);
             // 切换到日志标签页
             document.getElementById('logs-tab').click();
             startAutoRefresh();
         } catch (error) {
             console.error('执行所有账号登录失败:', error);
-            Swal.fire('错误', '执行所有账号登录失败', 'error');
+            Swal.fire('错误', error.message || '执行所有账号登录失败', 'error');
         }
     }
 }
@@ -626,9 +738,7 @@ function startKeepAlive() {
 
 // 页面卸载时清理
 window.addEventListener('beforeunload', function() {
-    if (refreshInterval) {
-        clearInterval(refreshInterval);
-    }
+    stopLogStream();
     if (keepAliveInterval) {
         clearInterval(keepAliveInterval);
     }
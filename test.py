@@ -72,6 +72,47 @@ def test_routes():
         print(f"❌ 路由测试失败: {e}")
         return False
 
+def test_cron_weekdays():
+    """测试 crontab 星期字段转换（crontab 周日为 0 或 7，APScheduler 以周一为 0）"""
+    print("测试定时计划星期字段...")
+    from datetime import datetime, timezone
+    from app import cron_weekdays, crontab_trigger
+    cases = [
+        ('0', 'sun'),
+        ('7', 'sun'),
+        ('1-5', 'mon,tue,wed,thu,fri'),
+        ('5-7', 'sun,fri,sat'),
+        ('*/2', 'sun,tue,thu,sat'),
+    ]
+    try:
+        for field, expected in cases:
+            result = cron_weekdays(field)
+            if result != expected:
+                print(f"❌ 星期字段 '{field}' 转换为 '{result}'，应为 '{expected}'")
+                return False
+            print(f"✅ '{field}' -> {result}")
+        
+        try:
+            cron_weekdays('5-0')
+            print("❌ 无效的星期字段 '5-0' 未被拒绝")
+            return False
+        except ValueError:
+            print("✅ '5-0' 被拒绝")
+        
+        # 2024-01-01 是周一，"周一 9 点" 的下一次触发应在当天
+        now = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+        fire_time = crontab_trigger('0 9 * * 1').get_next_fire_time(None, now)
+        if fire_time is None or fire_time.weekday() != 0:
+            print(f"❌ '0 9 * * 1' 的下一次触发时间为 {fire_time}，应为周一")
+            return False
+        print(f"✅ '0 9 * * 1' 下一次触发: {fire_time}")
+        
+        print("✅ 星期字段测试通过")
+        return True
+    except Exception as e:
+        print(f"❌ 星期字段测试失败: {e}")
+        return False
+
 def test_dependencies():
     """测试依赖包"""
     print("测试依赖包...")
@@ -109,7 +150,8 @@ def main():
     tests = [
         ("依赖包", test_dependencies),
         ("数据库", test_database),
-        ("路由", test_routes)
+        ("路由", test_routes),
+        ("定时计划", test_cron_weekdays)
     ]
     
     passed = 0